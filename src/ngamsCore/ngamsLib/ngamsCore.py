@@ -520,17 +520,25 @@ def mvFile(srcFilename,
     try:
         # Make target file writable if existing.
         checkCreatePath(os.path.dirname(trgFilename))
-        fileSize = getFileSize(srcFilename)
-
-        srcfil_mntpt = _find_mount_point(srcFilename)
-        trgfil_mntpt = _find_mount_point(trgFilename)
-        if srcfil_mntpt != trgfil_mntpt:
-            checkAvailDiskSpace(trgFilename, fileSize)
 
-        # Don't rely on os.rename as it can cause issues when crossing 
-        # disk parition boundaries
+        # Most of the time both files live in the same filesystem,
+        # in which case a simple rename is enough
         start = time.time()
-        shutil.move(srcFilename, trgFilename)
+        try:
+            os.rename(srcFilename, trgFilename)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+
+            # Don't rely on os.rename when crossing disk partition boundaries
+            fileSize = getFileSize(srcFilename)
+            srcfil_mntpt = _find_mount_point(srcFilename)
+            trgfil_mntpt = _find_mount_point(trgFilename)
+            if srcfil_mntpt != trgfil_mntpt:
+                checkAvailDiskSpace(trgFilename, fileSize)
+
+            start = time.time()
+            shutil.move(srcFilename, trgFilename)
         deltaTime = time.time() - start
 
     except Exception as e:
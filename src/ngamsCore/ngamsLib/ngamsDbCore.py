@@ -523,6 +523,7 @@ class transaction(object):
     def __init__(self, db_core, pool):
         self.db_core = db_core
         self.pool = pool
+        self._on_commit = []
 
     def __enter__(self):
         self.conn = self.pool.connection()
@@ -552,6 +553,23 @@ class transaction(object):
         if typ:
             raise
 
+        # Run the actions that need the changes to be committed first.
+        # The changes are already in the DB at this point, so a failing
+        # action is logged instead of being reported as a failure
+        for func, args in self._on_commit:
+            try:
+                func(*args)
+            except Exception:
+                logger.exception('Error while running post-commit action %r', func)
+
+    def on_commit(self, func, *args):
+        """
+        Calls `func` with `args` once the transaction has been committed.
+        Errors raised by `func` are logged, and don't prevent the remaining
+        actions from running
+        """
+        self._on_commit.append((func, args))
+
     def execute(self, sql, args=()):
         """Executes `sql` using `args`"""
 
@@ -583,6 +601,21 @@ class transaction(object):
                 res = cursor.fetchall()
             return res
 
+    def executemany(self, sql, rows):
+        """Executes `sql` once for each sequence of arguments in `rows`"""
+
+        # All rows bind the same number of parameters, so the query string
+        # is prepared only once, using the first row as the reference
+        rows = list(rows)
+        if not rows:
+            return
+        logger.debug("Performing SQL query for %d rows: %s / %r", len(rows), sql, rows[0])
+        sql, _ = self.db_core._prepare_query(sql, rows[0])
+        rows = [self.db_core._data_to_bind(row) for row in rows]
+
+        with ngamsDbTimer(self.db_core, sql):
+            self.cursor.executemany(sql, rows)
+
 class ngamsDbCore(object):
     """
     Core class for the NG/AMS DB interface.
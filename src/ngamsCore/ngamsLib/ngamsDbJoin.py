@@ -36,6 +36,7 @@ This class is not supposed to be used standalone in the present implementation.
 It should be used as part of the ngamsDbBase parent classes.
 """
 
+import collections
 import logging
 
 from . import ngamsDbm, ngamsDbCore, ngamsLib, ngamsFileInfo
@@ -44,6 +45,10 @@ from .ngamsCore import NGAMS_FILE_STATUS_OK, NGAMS_FILE_CHK_ACTIVE,NGAMS_DB_CH_F
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of File IDs looked up in a single query, which keeps the
+# query within the parameter limits of the supported databases
+_FILE_ID_BLOCK_SIZE = 500
+
 class ngamsDbJoin(ngamsDbCore.ngamsDbCore):
     """
     Contains queries for accessing the NGAS DB, which involves joining tables.
@@ -751,6 +756,22 @@ class ngamsDbJoin(ngamsDbCore.ngamsDbCore):
         return fileInfoDbmName
 
 
+    def _insert_file_entry_sql(self):
+        return ("INSERT INTO ngas_files (disk_id, file_name, file_id,"
+                "file_version, format, file_size, uncompressed_file_size,"
+                " compression, ingestion_date, %s, checksum, "
+                "checksum_plugin, file_status, creation_date, io_time, "
+                "ingestion_rate) VALUES ({}, {}, {}, {}, {}, {}, {}, {},"
+                " {}, {}, {},{}, {}, {}, {}, {})" % (self._file_ignore_columnname,))
+
+    def _update_file_entry_sql(self):
+        return ("UPDATE ngas_files SET "
+                "file_name={}, format={}, file_size={}, "
+                "uncompressed_file_size={}, compression={}, "
+                "%s={}, checksum={}, checksum_plugin={}, "
+                "file_status={}, creation_date={}, io_time={}, "
+                "ingestion_rate={}, disk_id={} WHERE file_id={} AND disk_id={}" % (self._file_ignore_columnname,))
+
     def writeFileEntry(self,
                        hostId,
                        diskId,
@@ -788,76 +809,160 @@ class ngamsDbJoin(ngamsDbCore.ngamsDbCore):
 
         Returns:         Void.
         """
-        # Check if the entry already exists. If yes update it, otherwise
-        # insert a new element.
-        if ignore == -1:
-            ignore = 0
+        fileInfo = ngamsFileInfo.ngamsFileInfo().\
+                        setDiskId(diskId).setFilename(filename).setFileId(fileId).\
+                        setFileVersion(fileVersion).setFormat(format).setFileSize(fileSize).\
+                        setUncompressedFileSize(uncompressedFileSize).setCompression(compression).\
+                        setIngestionDate(ingestionDate).setIgnore(ignore).setChecksum(checksum).\
+                        setChecksumPlugIn(checksumPlugIn).setFileStatus(fileStatus).setCreationDate(creationDate).\
+                        setIoTime(iotime).setIngestionRate(ingestionRate)
+        self.writeFileEntries(hostId, [fileInfo], genSnapshot=genSnapshot,
+                              updateDiskInfo=updateDiskInfo,
+                              prev_disk_ids=[prev_disk_id])
+
+
+    def _getExistingFileEntries(self, transaction, fileIds):
+        """
+        Count the ngas_files rows of the given files, both per file and disk,
+        and per file, disk and version. The files are looked up in blocks of
+        file IDs instead of one by one.
 
-        checksum = str(checksum) if checksum else None
-        ingDate = self.convertTimeStamp(ingestionDate)
-        creDate = self.convertTimeStamp(creationDate)
+        transaction:     Transaction to query in (transaction).
 
-        sql = []
-        vals = []
-        sql_str = None
-
-        if (self.fileInDb(prev_disk_id or diskId, fileId, fileVersion)):
-            # We only allow to modify a limited set of columns.
-            sql.append(("UPDATE ngas_files SET "
-                       "file_name={}, format={}, file_size={}, "
-                       "uncompressed_file_size={}, compression={}, "
-                       "%s={}, checksum={}, checksum_plugin={}, "
-                       "file_status={}, creation_date={}, io_time={}, "
-                       "ingestion_rate={}, disk_id={} WHERE file_id={} AND disk_id={}" % (self._file_ignore_columnname,)))
-            vals = [filename, format, fileSize, uncompressedFileSize, compression,\
-                    ignore, checksum, checksumPlugIn, fileStatus, creDate,\
-                    int(iotime*1000), ingestionRate, diskId, fileId, prev_disk_id or diskId]
+        fileIds:         IDs of the files to look up (list/string).
+
+        Returns:         Number of rows per (file_id, disk_id) and per
+                         (file_id, disk_id, file_version) (Counter).
+        """
+        counts = collections.Counter()
+        fileIds = sorted(set(fileIds))
+        for i in range(0, len(fileIds), _FILE_ID_BLOCK_SIZE):
+            block = fileIds[i:i + _FILE_ID_BLOCK_SIZE]
+            sql = ("SELECT file_id, disk_id, file_version FROM ngas_files "
+                   "WHERE file_id IN (%s)" % ','.join(['{}'] * len(block)))
+            for fileId, diskId, fileVersion in transaction.execute(sql, block):
+                counts[(fileId, diskId)] += 1
+                counts[(fileId, diskId, int(fileVersion))] += 1
+        return counts
+
+    def writeFileEntries(self,
+                         hostId,
+                         fileInfoList,
+                         genSnapshot = 1,
+                         transaction = None,
+                         updateDiskInfo = 0,
+                         prev_disk_ids = None):
+        """
+        Write the information of several files into the NGAS DB in a single
+        transaction. As with writeFileEntry, existing entries are updated,
+        while all new entries are inserted in one bulk operation.
+
+        hostId:          ID of the host writing the entries (string).
+
+        fileInfoList:    File information to write (list/ngamsFileInfo).
+
+        genSnapshot:     Generate a snapshot file (integer/0|1).
+
+        transaction:     Transaction to write the entries in. If not given a
+                         new one is used. The snapshot files are generated
+                         and the DB change events triggered only after the
+                         transaction has been committed (transaction).
+
+        updateDiskInfo:  Update automatically the disk info for the
+                         disks hosting the new files, after the
+                         transaction has been committed (integer/0|1).
+
+        prev_disk_ids:   IDs of the disks the files were registered on
+                         before, in the same order as fileInfoList. A
+                         file's existing entry is looked up, and moved from,
+                         that disk if given (list/string).
+
+        Returns:         Void.
+        """
+        if not fileInfoList:
+            return
+        if not transaction:
+            with self.transaction() as t:
+                self.writeFileEntries(hostId, fileInfoList, genSnapshot, t,
+                                      updateDiskInfo, prev_disk_ids)
+            return
+
+        t = transaction
+        prev_disk_ids = prev_disk_ids or [None] * len(fileInfoList)
+        existing = self._getExistingFileEntries(t, [f.getFileId() for f in fileInfoList])
+        inserted = []
+        updated = []
+        insert_vals = []
+        for fileInfo, prev_disk_id in zip(fileInfoList, prev_disk_ids):
+            diskId = fileInfo.getDiskId()
+            fileId = fileInfo.getFileId()
+            fileVersion = fileInfo.getFileVersion()
+            lookupDiskId = prev_disk_id or diskId
+            ignore = fileInfo.getIgnore()
+            if ignore == -1:
+                ignore = 0
+            checksum = fileInfo.getChecksum()
+            checksum = str(checksum) if checksum else None
+            creDate = self.convertTimeStamp(fileInfo.getCreationDate())
+            iotime = int(fileInfo.getIoTime() * 1000)
 
             if int(fileVersion) != -1:
-                sql.append(" AND file_version={}")
-                vals.append(fileVersion)
-
-            dbOperation = NGAMS_DB_CH_FILE_UPDATE
-            sql_str = ''.join(sql)
-        else:
-            sql_str = ("INSERT INTO ngas_files (disk_id, file_name, file_id,"
-                        "file_version, format, file_size, uncompressed_file_size,"
-                        " compression, ingestion_date, %s, checksum, "
-                        "checksum_plugin, file_status, creation_date, io_time, "
-                        "ingestion_rate) VALUES ({}, {}, {}, {}, {}, {}, {}, {},"
-                        " {}, {}, {},{}, {}, {}, {}, {})" % (self._file_ignore_columnname,))
-            vals = (diskId, filename, fileId, fileVersion, format, fileSize,\
-                    uncompressedFileSize, compression, ingDate, ignore,\
-                    checksum, checksumPlugIn, fileStatus, creDate,\
-                    int(iotime*1000), ingestionRate)
-            dbOperation = NGAMS_DB_CH_FILE_INSERT
-
-        self.query2(sql_str, args = vals)
-
-        # Update the Disk Info of the disk concerned if requested and
-        # if a new entry was added.
-        #
+                key = (fileId, lookupDiskId, int(fileVersion))
+            else:
+                key = (fileId, lookupDiskId)
+
+            if existing[key] == 1:
+                # We only allow to modify a limited set of columns.
+                sql = [self._update_file_entry_sql()]
+                vals = [fileInfo.getFilename(), fileInfo.getFormat(),
+                        fileInfo.getFileSize(), fileInfo.getUncompressedFileSize(),
+                        fileInfo.getCompression(), ignore, checksum,
+                        fileInfo.getChecksumPlugIn(), fileInfo.getFileStatus(),
+                        creDate, iotime, fileInfo.getIngestionRate(),
+                        diskId, fileId, lookupDiskId]
+                if int(fileVersion) != -1:
+                    sql.append(" AND file_version={}")
+                    vals.append(fileVersion)
+                t.execute(''.join(sql), vals)
+                updated.append(fileInfo)
+            else:
+                ingDate = self.convertTimeStamp(fileInfo.getIngestionDate())
+                insert_vals.append((diskId, fileInfo.getFilename(), fileId,
+                                    fileVersion, fileInfo.getFormat(),
+                                    fileInfo.getFileSize(),
+                                    fileInfo.getUncompressedFileSize(),
+                                    fileInfo.getCompression(), ingDate,
+                                    ignore, checksum,
+                                    fileInfo.getChecksumPlugIn(),
+                                    fileInfo.getFileStatus(), creDate,
+                                    iotime, fileInfo.getIngestionRate()))
+                inserted.append(fileInfo)
+
+        if insert_vals:
+            t.executemany(self._insert_file_entry_sql(), insert_vals)
+
         # Note: In case of an update the columns ngas_disks.avail_mb
         #       and ngas_disks.bytes_stored should in principle be
         #       updated according to the actual size of the new
         #       version of the file.
-        #print "writeFileEntry".upper(), updateDiskInfo, dbOperation
-        if (updateDiskInfo and (dbOperation == NGAMS_DB_CH_FILE_INSERT)):
-            self.updateDiskFileStatus(diskId, fileSize)
+        if updateDiskInfo:
+            for fileInfo in inserted:
+                t.on_commit(self.updateDiskFileStatus, fileInfo.getDiskId(),
+                            fileInfo.getFileSize())
+        t.on_commit(self._fileEntriesWritten, hostId, fileInfoList,
+                    inserted, updated, genSnapshot)
 
-        # Create a Temporary DB Change Snapshot Document if requested.
+    def _fileEntriesWritten(self, hostId, fileInfoList, inserted, updated, genSnapshot):
+
+        # Create the Temporary DB Change Snapshot Documents if requested.
         if (self.getCreateDbSnapshot() and genSnapshot):
-            tmpFileObj = ngamsFileInfo.ngamsFileInfo().\
-                            setDiskId(diskId).setFilename(filename).setFileId(fileId).\
-                            setFileVersion(fileVersion).setFormat(format).setFileSize(fileSize).\
-                            setUncompressedFileSize(uncompressedFileSize).setCompression(compression).\
-                            setIngestionDate(ingestionDate).setIgnore(ignore).setChecksum(checksum).\
-                            setChecksumPlugIn(checksumPlugIn).setFileStatus(fileStatus).setCreationDate(creationDate).\
-                            setIoTime(iotime).setIngestionRate(ingestionRate)
-            self.createDbFileChangeStatusDoc(hostId, dbOperation, [tmpFileObj])
-            del tmpFileObj
-
-        self.triggerEvents([diskId, None])
+            if inserted:
+                self.createDbFileChangeStatusDoc(hostId, NGAMS_DB_CH_FILE_INSERT, inserted)
+            if updated:
+                self.createDbFileChangeStatusDoc(hostId, NGAMS_DB_CH_FILE_UPDATE, updated)
+
+        for diskId in set(f.getDiskId() for f in fileInfoList):
+            self.triggerEvents([diskId, None])
 
 
     def getClusterReadyArchivingUnits(self,
@@ -202,6 +202,61 @@ class ngamsDbNgasContainers(ngamsDbCore.ngamsDbCore):
         logger.debug("Created container '%s' with id '%s'", containerName, containerId)
         return containerId
 
+    def createContainers(self, containers):
+        """
+        Creates all the given containers in a single bulk insert.
+        The containers are ngamsContainer objects sorted in a way that
+        parent containers always come before their children; their
+        parents, if any, either come earlier in the list or already exist.
+        A fresh new ID is assigned to each container, and their ingestion
+        dates are taken from the objects themselves.
+
+        As with createContainer, two sub-containers of the same parent
+        cannot share the same name.
+
+        :param containers: list of ngamsContainer.ngamsContainer
+        """
+
+        rows = []
+        newIds = set()
+        names = set()
+        for cont in containers:
+            containerName = cont.getContainerName()
+            parent = cont.getParentContainer()
+            parentContainerId = parent.getContainerId() if parent else None
+            parentContainerId = str(parentContainerId) if parentContainerId else None
+
+            # New containers can only clash with their new siblings, while
+            # existing parents need to be checked against the database
+            if parentContainerId and parentContainerId not in newIds:
+                sql = "SELECT container_name FROM ngas_containers WHERE parent_container_id = {0} and container_name = {1}"
+                if self.query2(sql, args=(parentContainerId, containerName)):
+                    raise Exception("A container with name '" + containerName + "' already exists as subcontainer of '" +\
+                                    parentContainerId + "', cannot add a new container with the same name")
+            if (parentContainerId, containerName) in names:
+                raise Exception("More than one container with name '" + containerName + "' found under the same parent")
+            names.add((parentContainerId, containerName))
+
+            containerId = str(uuid.uuid4())
+            newIds.add(containerId)
+            cont.setContainerId(containerId)
+
+            containerSize = max(cont.getContainerSize(), 0)
+            ingestionDate = self.asTimestamp(cont.getIngestionDate())
+            rows.append((containerId, parentContainerId, containerName, containerSize, ingestionDate))
+
+        sql = "INSERT INTO ngas_containers (" +\
+                    "container_id," +\
+                    "parent_container_id," +\
+                    "container_name," +\
+                    "container_size," +\
+                    "ingestion_date," +\
+                    "container_type) " +\
+               "VALUES ({0},{1},{2},{3},{4},'logical')"
+        with self.transaction() as t:
+            t.executemany(sql, rows)
+        logger.debug("Created %d containers", len(rows))
+
     def destroySingleContainer(self, containerId, checkForChildren):
         """
         Destroys a single container with id containerId.
@@ -239,6 +294,22 @@ class ngamsDbNgasContainers(ngamsDbCore.ngamsDbCore):
         sql = "UPDATE ngas_containers SET container_size = {0} WHERE container_id = {1}"
         self.query2(sql, args=(containerSize, containerId))
 
+    def setContainerSizes(self, containerSizes, transaction=None):
+        """
+        Sets the sizes of several containers with one bulk UPDATE.
+        containerSizes is a sequence of (containerId, containerSize) tuples.
+        The sizes are written in transaction when given, so that they are
+        committed together with the files counted in them; otherwise they
+        are committed on their own
+        """
+        sql = "UPDATE ngas_containers SET container_size = {0} WHERE container_id = {1}"
+        rows = [(size, contId) for contId, size in containerSizes]
+        if transaction:
+            transaction.executemany(sql, rows)
+        else:
+            with self.transaction() as t:
+                t.executemany(sql, rows)
+
     def addToContainerSize(self, containerId, amount):
         """
         Updates the size of the indicated container by the given amount
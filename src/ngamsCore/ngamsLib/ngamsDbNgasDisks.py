@@ -663,19 +663,23 @@ class ngamsDbNgasDisks(ngamsDbCore.ngamsDbCore):
         sql = sql % ngamsDbCore.getNgasDisksCols()
         return self.query2(sql, args=(hostId,))
 
-    def updateDiskInfo(self, fileSize, diskId):
+    def updateDiskInfo(self, fileSize, diskId, numberOfFiles=1, transaction=None):
         """
         Update the row for the volume ``diskId`` hosting the new file of size
-        ``fileSize``.
+        ``fileSize``. If ``numberOfFiles`` is given, ``fileSize`` is the
+        total size of that many new files. Passing the ``transaction`` that
+        registers the files keeps the volume's counters from drifting if
+        the registration is rolled back.
         """
-        self._add_file(self.query2, fileSize, diskId)
+        query_method = transaction.execute if transaction else self.query2
+        self._add_file(query_method, fileSize, diskId, numberOfFiles)
 
-    def _add_file(self, query_method, fileSize, diskId):
+    def _add_file(self, query_method, fileSize, diskId, numberOfFiles=1):
         sqlQuery = "UPDATE ngas_disks SET " +\
-                   "number_of_files=(number_of_files + 1), " +\
-                   "bytes_stored=(bytes_stored + {0}) WHERE " +\
-                   "disk_id={1}"
-        query_method(sqlQuery, args=(fileSize, diskId))
+                   "number_of_files=(number_of_files + {0}), " +\
+                   "bytes_stored=(bytes_stored + {1}) WHERE " +\
+                   "disk_id={2}"
+        query_method(sqlQuery, args=(numberOfFiles, fileSize, diskId))
 
     def _remove_file(self, query_method, file_size, disk_id):
         sql = """UPDATE ngas_disks
@@ -545,6 +545,25 @@ class ngamsDbNgasFiles(ngamsDbCore.ngamsDbCore):
 
         return fileSize
 
+    def addFilesToContainers(self, containerFiles, transaction=None):
+        """
+        Adds several files to their containers with one bulk UPDATE. The files
+        are given as (containerId, fileId) tuples, and are associated with
+        their new containers regardless of whether they currently belong to
+        another one, like addFileToContainer does with the force flag.
+
+        :param list containerFiles: (containerId, fileId) tuples
+        :param transaction: the transaction to carry out the update in;
+         a new one is used if not given
+        """
+        sql = "UPDATE ngas_files SET container_id = {0} WHERE file_id = {1}"
+        if transaction:
+            transaction.executemany(sql, containerFiles)
+        else:
+            with self.transaction() as t:
+                t.executemany(sql, containerFiles)
+        logger.debug('Added %d files to their containers', len(containerFiles))
+
     def removeFileFromContainer(self, fileId, containerId):
         """
         Removes the file pointed by fileId from the container
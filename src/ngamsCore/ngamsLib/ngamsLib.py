@@ -34,12 +34,14 @@ NG/AMS implementation.
 The functions in this module can be used in all the NG/AMS code.
 """
 
+import email.parser
 import gzip
 import logging
 import os
 import shutil
 import socket
 
+import six
 from six.moves.urllib import parse as urlparse  # @UnresolvedImport
 from six.moves import cPickle # @UnresolvedImport
 
@@ -96,20 +98,19 @@ def parseHttpHdr(httpHdr):
 
 def httpMsgObj2Dic(httpMessageObj):
     """
-    Stores the HTTP header information of mimetools.Message object
-    in a dictionary, whereby the header names are keys.
+    Stores the HTTP header information of a message object in a dictionary,
+    whereby the (lowercase) header names are keys. The headers can also be
+    given in their textual form, in which case they are parsed first.
 
-    httpMessageObj:     Message object (mimetools.Message).
+    httpMessageObj:     Message object or HTTP headers
+                        (mimetools.Message|http.client.HTTPMessage|string).
 
     Returns:            Dictionary with HTTP header information (dictionary).
     """
-    httpHdrDic = {}
-    for httpHdr in str(httpMessageObj).split("\r\n"):
-        if (httpHdr != ""):
-            idx = httpHdr.index(":")
-            hdr, val = [httpHdr[0:idx].lower(), httpHdr[(idx + 2):]]
-            httpHdrDic[hdr] = val
-    return httpHdrDic
+    if isinstance(httpMessageObj, six.string_types):
+        parser = email.parser.HeaderParser()
+        httpMessageObj = parser.parsestr(httpMessageObj, headersonly=True)
+    return {hdr.lower(): val for hdr, val in httpMessageObj.items()}
 
 
 def getCompleteHostName():
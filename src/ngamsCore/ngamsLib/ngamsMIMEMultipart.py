@@ -173,20 +173,23 @@ class FilesystemWriterHandler(ContainerBuilderHandler):
         self._crc = 0
 
     def handleData(self, buf, moreExpected):
-        # Write always in _writeBlockSize blocks
-        while len(buf) > self._writeBlockSize:
-            block = buf[:self._writeBlockSize]
-            buf = buf[self._writeBlockSize:]
-            self.timedWrite(block)
+        # Write always in _writeBlockSize blocks, slicing through a
+        # memoryview so the data is not copied over and over again
+        bufView = memoryview(buf)
+        blockSize = self._writeBlockSize
+        start = 0
+        while len(buf) - start > blockSize:
+            self.timedWrite(bufView[start:start + blockSize])
+            start += blockSize
 
         # If the content of this file has finished
         # arriving write the last piece to the file;
         # otherwise return the remaining data so it's
         # considered during the next call
         if not moreExpected:
-            self.timedWrite(buf)
-        elif len(buf) > 0:
-            return buf
+            self.timedWrite(bufView[start:])
+        elif len(buf) > start:
+            return buf[start:]
 
         return None
 
@@ -201,12 +204,15 @@ class FilesystemWriterHandler(ContainerBuilderHandler):
             self._crcTime += (time.time() - t)
 
     def endFile(self):
+        # Size and creation time are taken from the open file, so users
+        # don't need to stat it again
         logger.debug('Closing file %s', self._filename)
+        self._fdOut.flush()
+        stat = os.fstat(self._fdOut.fileno())
         self._fdOut.close()
-        if self._calculateCRC:
-            self._fileDataList.append([self._container, self._filename, self._crc])
-        else:
-            self._fileDataList.append([self._container, self._filename])
+        crc = self._crc if self._calculateCRC else None
+        self._fileDataList.append([self._container, self._filename, crc,
+                                   stat.st_size, stat.st_ctime])
 
     def getContainerName(self):
         return self._containerName
@@ -411,18 +417,29 @@ class MIMEMultipartParser(object):
             # When found, finish writing data, and pass the
             # delimiter to the ReadingState.delimiter state
             if state == self._ReadingState.data:
-                delIdx  = buf.find(CRLF + b'--' + boundary)
+                delimiter = CRLF + b'--' + boundary
+                delIdx  = buf.find(delimiter)
+                tail = None
                 if delIdx != -1:
                     logger.debug('Found end of file %s because we found boundary: %s', filename, boundary)
                     state = self._ReadingState.delimiter
                     prevBuf = buf[delIdx:]
                     buf = buf[:delIdx]
 
+                # The delimiter could be split between this and the next
+                # reading, so its possible beginning is kept for later
+                elif bytesRead:
+                    tailIdx = max(len(buf) - len(delimiter) + 1, 0)
+                    tail = buf[tailIdx:]
+                    buf = buf[:tailIdx]
+
                 buf = self._handler.handleData(buf, state == self._ReadingState.data)
                 if buf and len(buf):
                     if prevBuf:
                         raise Exception('No data should be returned when delimiter has been found')
                     prevBuf = buf
+                if tail:
+                    prevBuf = prevBuf + tail if prevBuf else tail
 
             # If nothing was read, and nothing
             # was left for the next iteration, stop
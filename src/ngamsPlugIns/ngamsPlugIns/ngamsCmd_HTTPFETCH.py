@@ -104,7 +104,7 @@ def save_to_file(ngams_server, request_properties, target_filename, block_size,
 
     if start_byte != 0 and download_resume_supported:
         logger.info("Resume requested and mirroring source supports resume. Appending data to previous staging file")
-        crc = ngamsFileUtils.get_checksum(65536, target_filename, crc_variant)
+        crc = ngamsFileUtils.get_checksum(ngamsFileUtils.MIN_BLOCK_SIZE, target_filename, crc_variant)
         request_properties.setBytesReceived(start_byte)
         fd_out = open(target_filename, "ab")
     else:
@@ -133,7 +133,10 @@ def save_to_file(ngams_server, request_properties, target_filename, block_size,
     write_duration = 0
     read_total_bytes = 0
 
+    # Data is read into a single, reusable buffer when possible, which avoids
+    # allocating a new bytes object for each block
     crc_method = crc_info.method
+    buf = memoryview(bytearray(block_size)) if hasattr(response, 'readinto') else None
     with contextlib.closing(response), contextlib.closing(fd_out):
         while remaining_size > 0:
             if remaining_size < read_size:
@@ -141,9 +144,13 @@ def save_to_file(ngams_server, request_properties, target_filename, block_size,
 
             # Read the remote file
             read_start_time = time.time()
-            data_buffer = response.read(read_size)
+            if buf is not None:
+                size_read = response.readinto(buf[:read_size])
+                data_buffer = buf[:size_read]
+            else:
+                data_buffer = response.read(read_size)
+                size_read = len(data_buffer)
             read_duration += time.time() - read_start_time
-            size_read = len(data_buffer)
             read_total_bytes += size_read
 
             if size_read == 0:
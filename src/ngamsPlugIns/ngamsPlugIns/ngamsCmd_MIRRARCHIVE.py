@@ -46,8 +46,8 @@ import logging
 import os
 import time
 
-from ngamsLib import ngamsDiskInfo, ngamsDbCore
 from ngamsLib.ngamsCore import genLog, getFileCreationTime, mvFile, NGAMS_FILE_STATUS_OK, NGAMS_ONLINE_STATE
+from ngamsServer import ngamsFileUtils
 from . import ngamsCmd_HTTPFETCH
 from . import ngamsCmd_RSYNCFETCH
 from . import ngamsDAPIMirroring
@@ -56,34 +56,6 @@ from . import ngamsFailedDownloadException
 logger = logging.getLogger(__name__)
 
 
-def get_target_volume(ngams_server):
-    """
-    Get a random target volume with availability
-    :param ngams_server: Reference to NG/AMS server class object (ngamsServer)
-    :return: Target volume object or None (ngamsDiskInfo | None)
-    """
-    sql = "select %s from ngas_disks nd " \
-          "where completed=0 AND host_id={0} order by available_mb desc" % ngamsDbCore.getNgasDisksCols()
-    result = ngams_server.getDb().query2(sql, args=(ngams_server.getHostId(),))
-    if not result:
-        return None
-    else:
-        return ngamsDiskInfo.ngamsDiskInfo().unpackSqlResult(result[0])
-
-
-def update_disk_info(ngams_server, result_dapi, available_space):
-    """
-    Update the row for the volume hosting the new file
-    :param ngams_server: Reference to NG/AMS server class object (ngamsServer)
-    :param result_dapi: Result returned from the DAPI (ngamsDapiStatus)
-    :param available_space: Remaining space in disk (in MB)
-    """
-    sql = "update ngas_disks " \
-          "set number_of_files=(number_of_files + 1), available_mb = {0}, bytes_stored = (bytes_stored + {1}) " \
-          "where disk_id = {2}"
-    ngams_server.getDb().query2(sql, args=(available_space, result_dapi.getFileSize(), result_dapi.getDiskId()))
-
-
 def save_in_staging_file(ngams_server, ngams_config, request_properties, staging_filename, start_byte):
     """
     Save the data ready on the HTTP channel, into the given staging area file
@@ -94,7 +66,7 @@ def save_in_staging_file(ngams_server, ngams_config, request_properties, staging
     :param start_byte: Start byte offset
     :return: File save to archive status information (tuple)
     """
-    block_size = ngams_config.getBlockSize()
+    block_size = max(ngams_config.getBlockSize(), ngamsFileUtils.MIN_BLOCK_SIZE)
     fetch_method = 'HTTP'
     if ngams_config.getVal("Mirroring[1].fetch_method"):
         fetch_method = ngams_config.getVal("Mirroring[1].fetch_method")
@@ -176,22 +148,20 @@ def __handle_command(ngams_server, request_properties):
             raise ngamsFailedDownloadException.FailedDownloadException(e)
 
     # Invoke DAPI
-    logger.info("Invoking DAPI for mirroring")
+    logger.debug("Invoking DAPI for mirroring")
     result_dapi = ngamsDAPIMirroring.ngams_generic(ngams_server, request_properties)
 
     # Move file to final destination
-    logger.info("Moving file to final destination: %s", result_dapi.getCompleteFilename())
+    logger.debug("Moving file to final destination: %s", result_dapi.getCompleteFilename())
     mtime = mvFile(request_properties.getStagingFilename(), result_dapi.getCompleteFilename())
     request_properties.incIoTime(mtime)
 
     # Check/generate remaining file info and update in DB
-    logger.info("Creating DB entry")
     creation_date = ngams_server.getDb().convertTimeStamp(getFileCreationTime(result_dapi.getCompleteFilename()))
-    sql = "update ngas_disks " \
-          "set available_mb = available_mb - {0} / (1024 * 1024), bytes_stored = bytes_stored + {1} " \
-          "where disk_id = {2}"
-    ngams_server.getDb().query2(sql, args=(result_dapi.getFileSize(), result_dapi.getFileSize(),
-                                           result_dapi.getDiskId()))
+    disk_sql = "update ngas_disks " \
+               "set available_mb = available_mb - {0} / (1024 * 1024), bytes_stored = bytes_stored + {1} " \
+               "where disk_id = {2}"
+    disk_args = (result_dapi.getFileSize(), result_dapi.getFileSize(), result_dapi.getDiskId())
 
     timestamp = ngams_server.getDb().convertTimeStamp(time.time())
     io_time = int(request_properties.getIoTime() * 1000)
@@ -214,9 +184,13 @@ def __handle_command(ngams_server, request_properties):
             result_dapi.getUncomprSize(), str(result_dapi.getCompression()), timestamp,
             str(staging_info.crc), staging_info.crcname, NGAMS_FILE_STATUS_OK,
             creation_date, io_time, ingest_rate)
-    logger.info("Will try to insert the file information: %s / %r", sql, args)
+    logger.debug("Will try to insert the file information: %s / %r", sql, args)
     try:
-        ngams_server.getDb().query2(sql, args=args)
+        # The volume is updated in the same transaction, so it is left
+        # untouched if the file fails to be registered
+        with ngams_server.getDb().transaction() as t:
+            t.execute(disk_sql, disk_args)
+            t.execute(sql, args)
     except Exception:
         # this shouldn't happen, but it can. If we rapidly restart a server then there can be some race condition
         # where a thread is already downloading the file and actually finishes it. Meanwhile the main mirroring thread
@@ -58,6 +58,7 @@ import contextlib
 import collections
 import logging
 import os
+import random
 import time
 import threading
 
@@ -577,17 +578,21 @@ _cached_disk_info = {}
 
 def get_target_volume(ngams_server):
     """
-    Get the volume with most space available
+    Get a random volume among those with enough space available, so the load is balanced across them. Volumes have
+    enough space if they are above the configured FreeSpaceDiskChangeMb limit; if none is, the volume with most space
+    available is returned
     :param ngams_server: Reference to NG/AMS server class object (ngamsServer)
     :return: Target volume object or None (ngamsDiskInfo | None)
     """
-    sql = "select %s from ngas_disks nd where completed = 0 and host_id = {0} order by available_mb desc"\
-          % ngamsDbCore.getNgasDisksCols()
-    result = ngams_server.getDb().query2(sql, args=(ngams_server.getHostId(),))
-    if not result:
+    result = ngams_server.getDb().getAvailableVolumes(ngams_server.getHostId())
+    volumes = [ngamsDiskInfo.ngamsDiskInfo().unpackSqlResult(row) for row in result]
+    if not volumes:
         return None
-    else:
-        return ngamsDiskInfo.ngamsDiskInfo().unpackSqlResult(result[0])
+    min_free_mb = ngams_server.getCfg().getFreeSpaceDiskChangeMb() or 0
+    candidates = [v for v in volumes if v.getAvailableMb() >= min_free_mb]
+    if not candidates:
+        return max(volumes, key=lambda v: v.getAvailableMb())
+    return random.choice(candidates)
 
 
 def get_mounted_disk_info(ngams_server, mount_point):
@@ -40,12 +40,13 @@ import os
 import time
 
 from six.moves import http_client as httplib  # @UnresolvedImport
+from six.moves.urllib import parse as urlparse  # @UnresolvedImport
 from six.moves.urllib import request as urlrequest  # @UnresolvedImport
 
 from ngamsLib.ngamsCore import NGAMS_SUCCESS, NGAMS_HTTP_SUCCESS, \
     NGAMS_FAILURE, NGAMS_HTTP_POST, getHostName, \
     NGAMS_HTTP_HDR_CHECKSUM, genLog, NGAMS_IDLE_SUBSTATE
-from ngamsLib import ngamsStatus, ngamsHighLevelLib,  ngamsLib
+from ngamsLib import ngamsStatus, ngamsHighLevelLib
 
 
 logger = logging.getLogger(__name__)
@@ -55,7 +56,7 @@ def processHttpReply(http, basename, url):
     After file is sent, collect the ngams status from the remote server
     parse error message, and log if necessary
 
-    http:        the HTTP Client
+    http:        the HTTP connection
 
     basename    Name of the file sent to the remote ngas server (used in the content disposition)
 
@@ -63,20 +64,18 @@ def processHttpReply(http, basename, url):
     """
     logger.debug("Waiting for reply ...")
     # ngamsLib._setSocketTimeout(None, http)
-    reply, msg, hdrs = http.getreply()
-    if (hdrs == None):
-        errMsg = "Illegal/no response to HTTP request encountered!"
-        raise Exception(errMsg)
+    resp = http.getresponse()
+    reply, hdrs = resp.status, resp.msg
 
-    if (hdrs.has_key("content-length")):
+    if ("content-length" in hdrs):
         dataSize = int(hdrs["content-length"])
     else:
         dataSize = 0
 
-    data = http.getfile().read(dataSize)
+    data = resp.read(dataSize)
 
     stat = ngamsStatus.ngamsStatus()
-    if (data.strip() != ""):
+    if (data.strip()):
         stat.clear().unpackXmlDoc(data)
     else:
         # TODO: For the moment assume success in case no
@@ -98,13 +97,13 @@ def buildHttpClient(url,
     """
     construct the http client which sends file data to the remote next url
 
-    Returns:        httplib
+    Returns:        httplib.HTTPConnection
     """
     # Separate the URL from the command.
     idx = (url[7:].find("/") + 7)
     tmpUrl = url[7:idx]
     cmd    = url[(idx + 1):]
-    http = httplib.HTTP(tmpUrl)
+    http = httplib.HTTPConnection(tmpUrl)
 
     logger.debug("Sending HTTP header ...")
     logger.debug("HTTP Header: %s: %s", NGAMS_HTTP_POST, cmd)
@@ -128,7 +127,7 @@ def buildHttpClient(url,
 
     # rtobar, 14/3/16: the default timeout here was 1 [hr]! I'm keeping it like
     #                  that, but probably it's too much
-    http._conn.sock.settimeout(3600)
+    http.sock.settimeout(3600)
 
     return http
 
@@ -175,23 +174,21 @@ def saveFromHttpToHttp(reqPropsObj,
         # Distinguish between Archive Pull and Push Request. By Archive
         # Pull we may simply read the file descriptor until it returns "".
         sizeKnown = 0
-        if (reqPropsObj.is_GET() and
-            not reqPropsObj.getFileUri().startswith('http://')):
-            # (reqPropsObj.getSize() == -1)):
-            # Just specify something huge.
-            logger.debug("It is an Archive Pull Request/data with unknown size")
-            remSize = int(1e11)
-        elif reqPropsObj.getFileUri().startswith('http://'):
+        if reqPropsObj.getFileUri().startswith('http://'):
             logger.debug("It is an HTTP Archive Pull Request: trying to get Content-Length")
             httpInfo = rfile.info()
-            headers = httpInfo.headers
-            hdrsDict = ngamsLib.httpMsgObj2Dic(''.join(headers))
-            if hdrsDict.has_key('content-length'):
-                remSize = int(hdrsDict['content-length'])
+            contentLength = httpInfo.get('content-length')
+            if contentLength is not None:
+                remSize = int(contentLength)
             else:
                 logger.debug("No HTTP header parameter Content-Length!")
-                logger.debug("Header keys: %s",hdrsDict.keys())
+                logger.debug("Header keys: %s", httpInfo.keys())
                 remSize = int(1e11)
+        elif reqPropsObj.is_GET():
+            # (reqPropsObj.getSize() == -1)):
+            # Just specify something huge.
+            logger.debug("It is an Archive Pull Request/data with unknown size")
+            remSize = int(1e11)
         else:
             remSize = reqPropsObj.getSize()
             logger.debug("Archive Push/Pull Request - Data size: %d", remSize)
@@ -200,7 +197,6 @@ def saveFromHttpToHttp(reqPropsObj,
         http = buildHttpClient(nexturl, mimeType, contDisp, remSize, checksum = reqPropsObj.getHttpHdr(NGAMS_HTTP_HDR_CHECKSUM))
 
         # Receive the data.
-        buf = "-"
         rdSize = blockSize
         slow = blockSize / (512 * 1024.)  # limit for 'slow' transfers
 #        sizeAccu = 0
@@ -230,7 +226,7 @@ def saveFromHttpToHttp(reqPropsObj,
                 if (checkCRC):
                     crc = binascii.crc32(buf, crc)
                 wdt = time.time()
-                http._conn.sock.sendall(buf)
+                http.sock.sendall(buf)
                 wdt = time.time() - wdt
                 wdtt += wdt
                 if wdt >= slow: swb += 1
@@ -296,7 +292,7 @@ def saveFromHttpToHttp(reqPropsObj,
 
             if (reportHost):
                 try:
-                    rereply = urlrequest.urlopen('http://%s/report/hostdown?file_id=%s&next_url=%s' % (reportHost, basename, urllib2.quote(nexturl)), timeout = 15).read()
+                    rereply = urlrequest.urlopen('http://%s/report/hostdown?file_id=%s&next_url=%s' % (reportHost, basename, urlparse.quote(nexturl)), timeout = 15).read()
                     logger.info('Reply from sending file %s host-down event to server %s - %s', basename, reportHost, rereply)
                 except Exception:
                     logger.exception('Fail to send host-down event to server %s', reportHost)
@@ -304,8 +300,7 @@ def saveFromHttpToHttp(reqPropsObj,
         raise err
     finally:
         if (http != None):
-            #http.close()
-            del http
+            http.close()
 
 def handleCmd(srvObj,
               reqPropsObj,
@@ -325,7 +320,8 @@ def handleCmd(srvObj,
     """
     # Check if the URI is correctly set.
     logger.debug("Check if the URI is correctly set.")
-    if (reqPropsObj.getFileUri() == ""):
+    fileUri = reqPropsObj.getFileUri()
+    if (fileUri == ""):
         errMsg = genLog("NGAMS_ER_MISSING_URI")
         raise Exception(errMsg)
 
@@ -338,22 +334,22 @@ def handleCmd(srvObj,
     logger.debug("Get mime-type (try to guess if not provided as an HTTP parameter).")
     if (reqPropsObj.getMimeType() == ""):
         mimeType = ngamsHighLevelLib.\
-                   determineMimeType(srvObj.getCfg(), reqPropsObj.getFileUri())
+                   determineMimeType(srvObj.getCfg(), fileUri)
         reqPropsObj.setMimeType(mimeType)
 
     ## Set reference in request handle object to the read socket.
     logger.debug("Set reference in request handle object to the read socket.")
     rfile = httpRef.rfile
-    if reqPropsObj.getFileUri().startswith('http://'):
-        readFd = urlrequest.urlopen(reqPropsObj.getFileUri())
+    if fileUri.startswith('http://'):
+        readFd = urlrequest.urlopen(fileUri)
         rfile = readFd
 
-    logger.debug("Generate basename filename from URI: %s", reqPropsObj.getFileUri())
-    if (reqPropsObj.getFileUri().find("file_id=") >= 0):
-        file_id = reqPropsObj.getFileUri().split("file_id=")[1]
+    logger.debug("Generate basename filename from URI: %s", fileUri)
+    if (fileUri.find("file_id=") >= 0):
+        file_id = fileUri.split("file_id=")[1]
         baseName = os.path.basename(file_id)
     else:
-        baseName = os.path.basename(reqPropsObj.getFileUri())
+        baseName = os.path.basename(fileUri)
 
     blockSize = srvObj.getCfg().getBlockSize()
     jobManHost = srvObj.getCfg().getNGASJobMANHost()
@@ -120,7 +120,7 @@ def save_to_file(ngams_server, request_properties, target_filename):
     checksum = request_properties.checksum
     crc_variant = request_properties.checksum_plugin
     crc_start_time = time.time()
-    crc = ngamsFileUtils.get_checksum(65536, target_filename, crc_variant)
+    crc = ngamsFileUtils.get_checksum(ngamsFileUtils.MIN_BLOCK_SIZE, target_filename, crc_variant)
     crc_duration = time.time() - crc_start_time
     logger.info("CRC computed in %f [s]", crc_duration)
     logger.info('Cource checksum: %s - current checksum: %d', checksum, crc)
@@ -28,13 +28,16 @@ in the NGAS database. Because of this reason this module reuses
 methods defined in the ngamsCmd_QARCHIVE module
 """
 
+import collections
 import logging
+import multiprocessing.pool
 import os
+import re
 import time
 
 from ngamsLib.ngamsCore import genLog, checkCreatePath, \
     NGAMS_ONLINE_STATE, NGAMS_IDLE_SUBSTATE, NGAMS_BUSY_SUBSTATE, \
-    NGAMS_STAGING_DIR, genUniqueId, mvFile, getFileCreationTime, \
+    NGAMS_STAGING_DIR, genUniqueId, mvFile, \
     NGAMS_FILE_STATUS_OK, getDiskSpaceAvail, toiso8601, FMT_DATE_ONLY
 from ngamsLib import ngamsMIMEMultipart, ngamsHighLevelLib, ngamsFileInfo,\
     ngamsLib
@@ -44,6 +47,12 @@ from .. import ngamsCacheControlThread, ngamsArchiveUtils
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of threads used to move files to their final destination
+MAX_MOVING_THREADS = 4
+
+# Finds the source file version in the URI of the request
+_FILE_VERSION_RE = re.compile(r'file_version=(-?\d+)')
+
 def saveInStagingFile(ngamsCfgObj,
                       reqPropsObj,
                       httpRef,
@@ -68,7 +77,7 @@ def saveInStagingFile(ngamsCfgObj,
     try:
         blockSize = ngamsCfgObj.getBlockSize()
         return saveFromHttpToFile(ngamsCfgObj, reqPropsObj, httpRef, stagingFilename,
-                                  blockSize, 1, diskInfoObj)
+                                  blockSize, 1, diskInfoObj, ensureDir=False)
     except Exception as e:
         errMsg = genLog("NGAMS_ER_PROB_STAGING_AREA", [stagingFilename,str(e)])
         logger.exception(errMsg)
@@ -81,7 +90,8 @@ def saveFromHttpToFile(ngamsCfgObj,
                        trgFilename,
                        blockSize,
                        mutexDiskAccess = 1,
-                       diskInfoObj = None):
+                       diskInfoObj = None,
+                       ensureDir = True):
     """
     Save the data available on an HTTP channel into the given file.
 
@@ -100,10 +110,15 @@ def saveFromHttpToFile(ngamsCfgObj,
     diskInfoObj:     Disk info object. Only needed if mutual exclusion
                      is required for disk access (ngamsDiskInfo).
 
+    ensureDir:       Create the directory of the target file if it doesn't
+                     exist. Callers that created it already can skip
+                     this (boolean).
+
     Returns:         Tuple. Element 0: Time in took to write
                      file (s) (tuple).
     """
-    checkCreatePath(os.path.dirname(trgFilename))
+    if ensureDir:
+        checkCreatePath(os.path.dirname(trgFilename))
 
     start = time.time()
     try:
@@ -141,26 +156,73 @@ def saveFromHttpToFile(ngamsCfgObj,
             ngamsHighLevelLib.releaseDiskResource(ngamsCfgObj, diskInfoObj.getSlotId())
 
 
-def createContainers(container, parentContainer, srvObj):
+def createContainers(rootContainer, srvObj, ingestionDate):
     """
-    Recursively creates the necessary entries in the ngas_containers table
-    to store the given hierarchy of Container objects
+    Creates the necessary entries in the ngas_containers table to store
+    the given hierarchy of Container objects. The hierarchy is flattened
+    (parents first) so all entries are created with a single bulk insert.
+    All containers share the given ingestion date
     """
 
-    containerName = container.getContainerName()
-    ingestionDate = time.time()
-    parentContainerId = str(parentContainer.getContainerId()) if parentContainer else None
-    containerId = srvObj.getDb().createContainer(containerName,
-                                                 containerSize=0,
-                                                 ingestionDate=ingestionDate,
-                                                 parentContainerId=parentContainerId,
-                                                 parentKnownToExist=True)
-    container.setContainerId(containerId)
-    container.setIngestionDate(ingestionDate)
+    containers = []
+    pending = collections.deque([rootContainer])
+    while pending:
+        container = pending.popleft()
+        container.setIngestionDate(ingestionDate)
+        containers.append(container)
+        pending.extend(container.getContainers())
 
-    # Recurse on our children
-    for childContainer in container.getContainers():
-        createContainers(childContainer, container, srvObj)
+    srvObj.getDb().createContainers(containers)
+
+
+def registerFiles(srvObj, reqPropsObj, fileInfoList, containerSizes=None):
+    """
+    Registers in the DB all the files given as (containerId, fileInfo, move)
+    tuples in a single transaction, where move is the pending IO time of
+    moving the file to its final destination. In the same transaction the
+    files are added to their containers, the volume hosting them is updated
+    and, if containerSizes is given, the container sizes are set.
+    The list is emptied at the end.
+
+    A CARCHIVE request is registered in a single call, and thus a single
+    transaction, unless a File ID repeats within it. The file versions are
+    looked up in the DB, so the files seen before the repeated File ID are
+    registered (and committed) first, and each repetition starts a new
+    transaction.
+    """
+    fileInfos = []
+    reqIoTime = reqPropsObj.getIoTime()
+    localIoTime = 0.0
+    for _, fileInfo, move in fileInfoList:
+        localIoTime += move.get()
+        fileInfo.setIoTime(reqIoTime + localIoTime)
+        fileInfos.append(fileInfo)
+    reqPropsObj.incIoTime(localIoTime)
+
+    logger.debug("Creating db entries for %d files", len(fileInfos))
+    db = srvObj.getDb()
+    with db.transaction() as t:
+        if fileInfos:
+            db.writeFileEntries(srvObj.getHostId(), fileInfos, transaction=t)
+            db.addFilesToContainers([(containerId, fi.getFileId()) for containerId, fi, _ in fileInfoList],
+                                    transaction=t)
+
+            # All the files of a request are stored in the same volume
+            totalFileSize = sum(fi.getFileSize() for fi in fileInfos)
+            db.updateDiskInfo(totalFileSize, fileInfos[0].getDiskId(),
+                              len(fileInfos), transaction=t)
+        if containerSizes:
+            db.setContainerSizes(containerSizes.items(), transaction=t)
+
+    # Inform the caching service about the new files.
+    if (srvObj.getCachingActive()):
+        for fileInfo in fileInfos:
+            ngamsCacheControlThread.addEntryNewFilesDbm(srvObj,
+                                                       fileInfo.getDiskId(),
+                                                       fileInfo.getFileId(),
+                                                       fileInfo.getFileVersion(),
+                                                       fileInfo.getFilename())
+    del fileInfoList[:]
 
 
 def handleCmd(srvObj,
@@ -216,9 +278,9 @@ def handleCmd(srvObj,
         baseName = os.path.basename(file_id)
     else:
         baseName = os.path.basename(reqPropsObj.getFileUri())
-    stgFilename = os.path.join("/", targDiskInfo.getMountPoint(),
-                               NGAMS_STAGING_DIR,
-                               genUniqueId() + "___" + baseName)
+    stgDir = os.path.join("/", targDiskInfo.getMountPoint(), NGAMS_STAGING_DIR)
+    checkCreatePath(stgDir)
+    stgFilename = os.path.join(stgDir, genUniqueId() + "___" + baseName)
     logger.debug("Staging filename is: %s", stgFilename)
     reqPropsObj.setStagingFilename(stgFilename)
 
@@ -232,112 +294,115 @@ def handleCmd(srvObj,
     ingestRate = stagingInfo[3]
     reqPropsObj.incIoTime(ioTime)
 
-    createContainers(rootContainer, None, srvObj)
+    # All containers and files of the request share the same ingestion date
+    ingestionDate = time.time()
+    createContainers(rootContainer, srvObj, ingestionDate)
 
     # Generate file information.
     diskInfo = reqPropsObj.getTargDiskInfo()
+    diskId = diskInfo.getDiskId()
+    slotId = diskInfo.getSlotId()
     logger.debug("Generate file information")
-    dateDir = toiso8601(fmt=FMT_DATE_ONLY)
+    dateDir = toiso8601(ingestionDate, fmt=FMT_DATE_ONLY)
     resDapiList = []
+    fileInfoList = []
+    pendingFileIds = set()
 
     containerSizes = {}
 
-    for item in fileDataList:
-        container = item[0]
-        filepath = item[1]
-        crc = item[2]
-
-        containerId = str(container.getContainerId())
-        basename = os.path.basename(filepath)
-        fileId = basename
-
-        fileVersion, relPath, relFilename,\
-                     complFilename, fileExists =\
-                     ngamsPlugInApi.genFileInfo(srvObj.getDb(),
-                                                srvObj.getCfg(),
-                                                reqPropsObj, diskInfo,
-                                                filepath,
-                                                fileId,
-                                                basename, [dateDir])
-        complFilename = ngamsLib.remove_duplicated_extension(complFilename)
-        relFilename = ngamsLib.remove_duplicated_extension(relFilename)
-
-        # Keep track of the total size of the container
-        uncomprSize = ngamsPlugInApi.getFileSize(filepath)
-        if containerId not in containerSizes:
-            containerSizes[containerId] = 0
-        containerSizes[containerId] += uncomprSize
-
-        mimeType = reqPropsObj.getMimeType()
-        compression = "NONE"
-        archFileSize = ngamsPlugInApi.getFileSize(filepath)
-
-        resDapi = ngamsPlugInApi.genDapiSuccessStat(diskInfo.getDiskId(),
-                                                     relFilename,
-                                                     fileId,
-                                                     fileVersion, mimeType,
-                                                     archFileSize, uncomprSize,
-                                                     compression, relPath,
-                                                     diskInfo.getSlotId(),
-                                                     fileExists, complFilename)
-        # Move file to final destination.
-        logger.debug("Moving file to final destination")
-        ioTime = mvFile(filepath,
-                        resDapi.getCompleteFilename())
-        reqPropsObj.incIoTime(ioTime)
-
-        # Get crc info
-        checksumPlugIn = "StreamCrc32"
-        checksum = str(crc)
-
-        # Get source file version
-        # e.g.: http://ngas03.hq.eso.org:7778/RETRIEVE?file_version=1&file_id=X90/X962a4/X1
-        logger.debug("Get file version")
-        file_version = resDapi.getFileVersion()
-        if reqPropsObj.getFileUri().count("file_version"):
-            file_version = int((reqPropsObj.getFileUri().split("file_version=")[1]).split("&")[0])
-
-        # Check/generate remaining file info + update in DB.
-        logger.debug("Creating db entry")
-        creDate = getFileCreationTime(resDapi.getCompleteFilename())
-        fileInfo = ngamsFileInfo.ngamsFileInfo().\
-                   setDiskId(resDapi.getDiskId()).\
-                   setFilename(resDapi.getRelFilename()).\
-                   setFileId(resDapi.getFileId()).\
-                   setFileVersion(file_version).\
-                   setFormat(resDapi.getFormat()).\
-                   setFileSize(resDapi.getFileSize()).\
-                   setUncompressedFileSize(resDapi.getUncomprSize()).\
-                   setCompression(resDapi.getCompression()).\
-                   setIngestionDate(time.time()).\
-                   setChecksum(checksum).setChecksumPlugIn(checksumPlugIn).\
-                   setFileStatus(NGAMS_FILE_STATUS_OK).\
-                   setCreationDate(creDate).\
-                   setIoTime(reqPropsObj.getIoTime())
-        fileInfo.write(srvObj.getHostId(), srvObj.getDb())
-
-        # Add the file to the container
-        srvObj.getDb().addFileToContainer(containerId, resDapi.getFileId(), True)
-
-        # Update the container sizes
-        for contSizeInfo in containerSizes.items():
-            srvObj.getDb().setContainerSize(contSizeInfo[0], contSizeInfo[1])
-
-        # Inform the caching service about the new file.
-        logger.debug("Inform the caching service about the new file.")
-        if (srvObj.getCachingActive()):
-            diskId      = resDapi.getDiskId()
-            fileId      = resDapi.getFileId()
-            fileVersion = file_version
-            filename    = resDapi.getRelFilename()
-            ngamsCacheControlThread.addEntryNewFilesDbm(srvObj, diskId, fileId,
-                                                       fileVersion, filename)
-
-        # Update disk info in NGAS Disks.
-        logger.debug("Update disk info in NGAS Disks.")
-        srvObj.getDb().updateDiskInfo(resDapi.getFileSize(), resDapi.getDiskId())
-
-        resDapiList.append(resDapi)
+    # Get source file version
+    # e.g.: http://ngas03.hq.eso.org:7778/RETRIEVE?file_version=1&file_id=X90/X962a4/X1
+    logger.debug("Get file version")
+    forcedFileVersion = None
+    match = _FILE_VERSION_RE.search(reqPropsObj.getFileUri())
+    if match:
+        forcedFileVersion = int(match.group(1))
+
+    # Files are moved to their final destination in the background,
+    # while the DB is accessed only from this thread
+    movePool = multiprocessing.pool.ThreadPool(max(1, min(MAX_MOVING_THREADS, len(fileDataList))))
+    try:
+        for item in fileDataList:
+            container = item[0]
+            filepath = item[1]
+            crc = item[2]
+            uncomprSize = item[3]
+            creationDate = item[4]
+
+            containerId = str(container.getContainerId())
+            basename = os.path.basename(filepath)
+            fileId = basename
+
+            # Files with the same name in different containers are stored as
+            # new versions of the same file, which requires the previous ones
+            # to be registered (and committed) already
+            if fileId in pendingFileIds:
+                registerFiles(srvObj, reqPropsObj, fileInfoList)
+                pendingFileIds.clear()
+            pendingFileIds.add(fileId)
+
+            fileVersion, relPath, relFilename,\
+                         complFilename, fileExists =\
+                         ngamsPlugInApi.genFileInfo(srvObj.getDb(),
+                                                    srvObj.getCfg(),
+                                                    reqPropsObj, diskInfo,
+                                                    filepath,
+                                                    fileId,
+                                                    basename, [dateDir])
+            complFilename = ngamsLib.remove_duplicated_extension(complFilename)
+            relFilename = ngamsLib.remove_duplicated_extension(relFilename)
+
+            # Keep track of the total size of the container
+            if containerId not in containerSizes:
+                containerSizes[containerId] = 0
+            containerSizes[containerId] += uncomprSize
+
+            compression = "NONE"
+            archFileSize = uncomprSize
+
+            resDapi = ngamsPlugInApi.genDapiSuccessStat(diskId,
+                                                         relFilename,
+                                                         fileId,
+                                                         fileVersion, mimeType,
+                                                         archFileSize, uncomprSize,
+                                                         compression, relPath,
+                                                         slotId,
+                                                         fileExists, complFilename)
+            # Move file to final destination.
+            move = movePool.apply_async(mvFile, (filepath, resDapi.getCompleteFilename()))
+
+            # Get crc info
+            checksumPlugIn = "StreamCrc32"
+            checksum = str(crc)
+
+            # Use the source file version if given
+            file_version = resDapi.getFileVersion()
+            if forcedFileVersion is not None:
+                file_version = forcedFileVersion
+
+            # Check/generate remaining file info + update in DB.
+            # The IO time is set once the file is moved
+            fileInfo = ngamsFileInfo.ngamsFileInfo().\
+                       setDiskId(resDapi.getDiskId()).\
+                       setFilename(resDapi.getRelFilename()).\
+                       setFileId(resDapi.getFileId()).\
+                       setFileVersion(file_version).\
+                       setFormat(resDapi.getFormat()).\
+                       setFileSize(resDapi.getFileSize()).\
+                       setUncompressedFileSize(resDapi.getUncomprSize()).\
+                       setCompression(resDapi.getCompression()).\
+                       setIngestionDate(ingestionDate).\
+                       setCreationDate(creationDate).\
+                       setChecksum(checksum).setChecksumPlugIn(checksumPlugIn).\
+                       setFileStatus(NGAMS_FILE_STATUS_OK)
+            fileInfoList.append((containerId, fileInfo, move))
+            resDapiList.append(resDapi)
+
+        # The last files are registered together with the container sizes
+        registerFiles(srvObj, reqPropsObj, fileInfoList, containerSizes)
+    finally:
+        movePool.close()
+        movePool.join()
 
     # Check if the disk is completed.
     # We use an approximate extimate for the remaning disk space to avoid
@@ -356,12 +421,12 @@ def handleCmd(srvObj,
     httpRef.send_ingest_status(msg, targDiskInfo)
 
 
-    for resDapi in resDapiList:
-        # Trigger Subscription Thread. This is a special version for MWA, in which we simply swapped MIRRARCHIVE and QARCHIVE
-        # chen.wu@icrar.org
-        logger.debug("triggering SubscriptionThread for file %s", resDapi.getFileId())
-        srvObj.addSubscriptionInfo([(resDapi.getFileId(),
-                                     resDapi.getFileVersion())], [])
+    # Trigger Subscription Thread. This is a special version for MWA, in which we simply swapped MIRRARCHIVE and QARCHIVE
+    # chen.wu@icrar.org
+    if resDapiList:
+        logger.debug("triggering SubscriptionThread for %d files", len(resDapiList))
+        srvObj.addSubscriptionInfo([(resDapi.getFileId(), resDapi.getFileVersion())
+                                    for resDapi in resDapiList], [])
         srvObj.triggerSubscriptionThread()
 
 # EOF
@@ -244,7 +244,7 @@ def _registerExec(srvObj,
             crc_variant = srvObj.cfg.getCRCVariant()
             if crc_variant == ngamsFileUtils.CHECKSUM_CRC32_INCONSISTENT:
                 crc_variant = 'ngamsGenCrc32'
-            checksum = ngamsFileUtils.get_checksum(65536, filename, crc_variant) or ''
+            checksum = ngamsFileUtils.get_checksum(ngamsFileUtils.MIN_BLOCK_SIZE, filename, crc_variant) or ''
 
             # Move file and update information about file in the NGAS DB.
             mvFile(filename, piRes.getCompleteFilename())
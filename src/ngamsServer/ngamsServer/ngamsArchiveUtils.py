@@ -606,7 +606,7 @@ def postFileRecepHandling(srvObj,
     # if checksum is already supplied then do not calculate it from the plugin
     if cksum is None:
         checksumPlugIn = ngamsFileUtils.get_checksum_name(srvObj.cfg.getCRCVariant())
-        checksum = ngamsFileUtils.get_checksum(65536, resultPlugIn.getCompleteFilename(), checksumPlugIn)
+        checksum = ngamsFileUtils.get_checksum(ngamsFileUtils.MIN_BLOCK_SIZE, resultPlugIn.getCompleteFilename(), checksumPlugIn)
     else:
         checksum, checksumPlugIn = cksum
 
@@ -35,7 +35,6 @@ functions, to deal with archive files.
 import binascii
 import collections
 import contextlib
-import functools
 import logging
 import os
 import re
@@ -809,6 +808,9 @@ def syncCachesCheckFiles(srvObj,
         raise Exception(errMsg)
 
 
+# Minimum block size used when streaming or checksumming file data
+MIN_BLOCK_SIZE = 1024 * 1024
+
 CHECKSUM_NULL = -1
 CHECKSUM_CRC32_INCONSISTENT = 0
 CHECKSUM_CRC32C = 1
@@ -917,14 +919,26 @@ def get_checksum(blocksize, fin, checksum_variant):
         my_fileobj = fileobj = open(fin, 'rb')
 
     # Read and checksum, thank you very much
-    read = fileobj.read
+    # When possible we read into a single pre-allocated buffer instead of
+    # creating a new bytes object per block; the checksum methods operate
+    # directly on the memoryview
     crc = crc_info.init
     try:
-        while True:
-            block = read(blocksize)
-            if not block:
-                break
-            crc = crc_m(block, crc)
+        if hasattr(fileobj, 'readinto'):
+            buf = memoryview(bytearray(blocksize))
+            readinto = fileobj.readinto
+            while True:
+                n = readinto(buf)
+                if not n:
+                    break
+                crc = crc_m(buf[:n], crc)
+        else:
+            read = fileobj.read
+            while True:
+                block = read(blocksize)
+                if not block:
+                    break
+                crc = crc_m(block, crc)
     finally:
         # We opened it, we close it
         if my_fileobj:
@@ -951,12 +965,16 @@ def get_checksum_interruptible(blocksize, filename, checksum_variant,
         return None
     crc_m = crc_info.method
     crc = crc_info.init
+    buf = memoryview(bytearray(blocksize))
     with open(filename, 'rb') as f:
-        for block in iter(functools.partial(f.read, blocksize), b''):
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
             checksum_allow_evt.wait()
             if checksum_stop_evt.is_set():
                 return
-            crc = crc_m(block, crc)
+            crc = crc_m(buf[:n], crc)
     crc = crc_info.final(crc)
     return crc
 
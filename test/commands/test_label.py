@@ -31,10 +31,18 @@
 This module contains the Test Suite for the LABEL Command.
 """
 
+import unittest
+
 from ngamsLib.ngamsCore import getHostName, NGAMS_LABEL_CMD
 from ..ngamsTestLib import ngamsTestSuite
 
 
+_HOST = getHostName()
+_PRINTER_FILE = "tmp/ngamsLabel_NGAS-" + _HOST + "-8888.prn"
+
+# TODO: The host name is contained in the label, run only on
+#       ngasdev2 for the moment ...
+@unittest.skipIf(_HOST != "ngasdev2", "label contains the host name")
 class ngamsLabelCmdTest(ngamsTestSuite):
     """
     Synopsis:
@@ -57,6 +65,20 @@ class ngamsLabelCmdTest(ngamsTestSuite):
     - Review Test Suite and add relevant Test Cases.
     """
 
+    def _check_label(self, pars, refStatFile, refPrnFile):
+        """
+        Start a server and submit a LABEL Command with the given parameters,
+        then verify its status and the printer file it generated against the
+        given reference files.
+        """
+        self.prepExtSrv()
+        status = self.get_status(NGAMS_LABEL_CMD, pars=pars)
+        self.assert_status_ref_file(refStatFile, status, msg="Incorrect status returned for LABEL Command")
+
+        tmpStatFile = self.ngas_path(_PRINTER_FILE)
+        self.checkFilesEq(refPrnFile, tmpStatFile,
+                          "Incorrect printer file generated by LABEL Command")
+
     def test_LabelCmd_1(self):
         """
         Synopsis:
@@ -80,20 +102,6 @@ class ngamsLabelCmdTest(ngamsTestSuite):
         ...
         """
 
-
-        # TODO: The host name is contained in the label, run only on
-        #       ngasdev2 for the moment ...
-        if (getHostName() != "ngasdev2"):
-            return
-
-        self.prepExtSrv()
-        status = self.get_status(NGAMS_LABEL_CMD,
-                                 pars = [["slot_id", "1"],
-                                         ["host_id", getHostName()]])
-        refStatFile = "ref/ngamsLabelCmdTest_test_LabelCmd_1_1_ref"
-        self.assert_status_ref_file(refStatFile, status, msg="Incorrect status returned for LABEL Command")
-
-        tmpStatFile = self.ngas_path("tmp/ngamsLabel_NGAS-" + getHostName() + "-8888.prn")
-        refStatFile= "ref/ngamsLabelCmdTest_test_LabelCmd_1_2_ref.prn"
-        self.checkFilesEq(refStatFile, tmpStatFile,
-                          "Incorrect printer file generated by LABEL Command")
\ No newline at end of file
+        self._check_label([["slot_id", "1"], ["host_id", _HOST]],
+                          "ref/ngamsLabelCmdTest_test_LabelCmd_1_1_ref",
+                          "ref/ngamsLabelCmdTest_test_LabelCmd_1_2_ref.prn")
\ No newline at end of file
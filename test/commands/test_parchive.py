@@ -0,0 +1,90 @@
+#
+#    ICRAR - International Centre for Radio Astronomy Research
+#    (c) UWA - The University of Western Australia, 2012
+#    Copyright by UWA (in the framework of the ICRAR)
+#    All rights reserved
+#
+#    This library is free software; you can redistribute it and/or
+#    modify it under the terms of the GNU Lesser General Public
+#    License as published by the Free Software Foundation; either
+#    version 2.1 of the License, or (at your option) any later version.
+#
+#    This library is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#    Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public
+#    License along with this library; if not, write to the Free Software
+#    Foundation, Inc., 59 Temple Place, Suite 330, Boston,
+#    MA 02111-1307  USA
+#
+#******************************************************************************
+#
+#
+"""
+Contains the Test Suite for the PARCHIVE Command.
+"""
+
+import contextlib
+import os
+import threading
+
+from six.moves import BaseHTTPServer  # @UnresolvedImport
+
+from ngamsLib import utils
+from ..ngamsTestLib import ngamsTestSuite
+
+
+class _dummy_handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Records the forwarded request and replies with the server's status"""
+
+    def do_POST(self):
+        size = int(self.headers['content-length'])
+        self.server.request = (self.path, self.headers, self.rfile.read(size))
+        self.send_response(self.server.reply_status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+@contextlib.contextmanager
+def dummy_server(reply_status):
+    """Serves a single request on a free port, yielding the server"""
+    port = utils.find_available_port(8900)
+    server = BaseHTTPServer.HTTPServer(('127.0.0.1', port), _dummy_handler)
+    server.reply_status = reply_status
+    server.request = None
+    server.timeout = 30
+    t = threading.Thread(target=server.handle_request)
+    t.start()
+    try:
+        yield server
+    finally:
+        t.join()
+        server.server_close()
+
+def next_url(server):
+    return 'http://127.0.0.1:%d/QARCHIVE' % server.server_port
+
+class ngamsParchiveCmdTest(ngamsTestSuite):
+
+    def test_forwarding(self):
+        self.prepExtSrv()
+        data = os.urandom(1024)
+        with dummy_server(200) as server:
+            self.archive_data(data, 'file1.txt', 'application/octet-stream',
+                              cmd='PARCHIVE', pars=[('nexturl', next_url(server))])
+
+        path, headers, body = server.request
+        self.assertTrue(path.endswith('QARCHIVE'))
+        self.assertEqual('application/octet-stream', headers['content-type'])
+        self.assertIn('filename="file1.txt"', headers['content-disposition'])
+        self.assertEqual(data, body)
+
+    def test_forwarding_error(self):
+        self.prepExtSrv()
+        with dummy_server(500) as server:
+            self.archive_data_fail(os.urandom(1024), 'file1.txt', 'application/octet-stream',
+                                   cmd='PARCHIVE', pars=[('nexturl', next_url(server))])
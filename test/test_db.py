@@ -20,9 +20,15 @@
 #    MA 02111-1307  USA
 #
 
-from ngamsLib import ngamsDb, ngamsDiskInfo, ngamsFileInfo
+from ngamsLib import ngamsDb, ngamsDiskInfo, ngamsFileInfo, ngamsContainer
 from test import ngamsTestLib
 
+
+def file_info(file_id, file_version=1, file_size=0, disk_id='disk-id'):
+    return ngamsFileInfo.ngamsFileInfo().setDiskId(disk_id).\
+           setFileId(file_id).setFileVersion(file_version).\
+           setFileSize(file_size)
+
 class DbTests(ngamsTestLib.ngamsTestSuite):
 
     def setUp(self):
@@ -47,4 +53,191 @@ class DbTests(ngamsTestLib.ngamsTestSuite):
         file_info.setFileId('file-id')
         file_info.write('host-id', self.db, genSnapshot=0)
         res = list(self.db.getFileInfoList('disk-id', fileId="*"))
-        self.assertEqual(1, len(res))
\ No newline at end of file
+        self.assertEqual(1, len(res))
+
+    def add_disk(self, disk_id='disk-id', number_of_files=0, bytes_stored=0):
+        """Registers a volume to hold the test files"""
+        disk_info = ngamsDiskInfo.ngamsDiskInfo()
+        disk_info.setDiskId(disk_id).setNumberOfFiles(number_of_files).\
+                  setBytesStored(bytes_stored)
+        disk_info.write(self.db)
+
+    def read_disk(self, disk_id='disk-id'):
+        return ngamsDiskInfo.ngamsDiskInfo().read(self.db, disk_id)
+
+    def test_write_file_entries(self):
+        """New file entries are inserted and existing ones updated"""
+
+        self.add_disk()
+        self.db.writeFileEntries('host-id', [file_info('file-1', 1, 10),
+                                             file_info('file-2', 1, 20)],
+                                 genSnapshot=0)
+        res = list(self.db.getFileInfoList('disk-id', fileId="*"))
+        self.assertEqual(2, len(res))
+
+        # One existing entry is updated, the other is new
+        self.db.writeFileEntries('host-id', [file_info('file-1', 1, 30),
+                                             file_info('file-1', 2, 40)],
+                                 genSnapshot=0)
+        res = list(self.db.getFileInfoList('disk-id', fileId="*"))
+        self.assertEqual(3, len(res))
+        self.assertEqual(30, self.db.getFileSize('file-1', 1))
+        self.assertEqual(40, self.db.getFileSize('file-1', 2))
+        self.assertEqual(20, self.db.getFileSize('file-2', 1))
+
+    def test_write_file_entry_from_previous_disk(self):
+        """An existing entry found on its previous disk is moved to the new one"""
+
+        self.add_disk('disk-1')
+        self.add_disk('disk-2')
+        fi = file_info('file-1', 1, 10, disk_id='disk-1')
+        fi.write('host-id', self.db, genSnapshot=0)
+
+        fi.setDiskId('disk-2').setFileSize(20)
+        fi.write('host-id', self.db, genSnapshot=0, prev_disk_id='disk-1')
+        self.assertEqual([], list(self.db.getFileInfoList('disk-1', fileId="*")))
+        self.assertEqual(1, len(list(self.db.getFileInfoList('disk-2', fileId="*"))))
+        self.assertEqual(20, self.db.getFileSize('file-1', 1))
+
+    def test_update_disk_info(self):
+        """A volume's file count and stored bytes grow by the given amounts,
+        and the update is rolled back with its transaction"""
+
+        self.add_disk(number_of_files=1, bytes_stored=5)
+        self.db.updateDiskInfo(10, 'disk-id')
+        self.db.updateDiskInfo(30, 'disk-id', numberOfFiles=3)
+        disk_info = self.read_disk()
+        self.assertEqual(5, disk_info.getNumberOfFiles())
+        self.assertEqual(45, disk_info.getBytesStored())
+
+        with self.assertRaises(ValueError):
+            with self.db.transaction() as t:
+                self.db.updateDiskInfo(10, 'disk-id', transaction=t)
+                raise ValueError()
+        with self.db.transaction() as t:
+            self.db.updateDiskInfo(20, 'disk-id', numberOfFiles=2, transaction=t)
+        disk_info = self.read_disk()
+        self.assertEqual(7, disk_info.getNumberOfFiles())
+        self.assertEqual(65, disk_info.getBytesStored())
+
+    def test_add_files_to_containers(self):
+        """Each file ends up in its own container, nested ones included"""
+
+        root = ngamsContainer.ngamsContainer('root')
+        child = ngamsContainer.ngamsContainer('child')
+        root.addContainer(child)
+        self.db.createContainers([root, child])
+
+        self.add_disk()
+        file_infos = [file_info(file_id) for file_id in ('file-1', 'file-2', 'file-3')]
+        self.db.writeFileEntries('host-id', file_infos, genSnapshot=0)
+
+        self.db.addFilesToContainers([(root.getContainerId(), 'file-1'),
+                                      (child.getContainerId(), 'file-2'),
+                                      (child.getContainerId(), 'file-3')])
+        cont = self.db.readHierarchy(root.getContainerId(), includeFiles=True)
+        self.assertEqual(['file-1'], [fi.getFileId() for fi in cont.getFilesInfo()])
+        child_files = [fi.getFileId() for fi in cont.getContainers()[0].getFilesInfo()]
+        self.assertEqual(['file-2', 'file-3'], sorted(child_files))
+
+    def test_create_containers(self):
+        """A container hierarchy is created whole, and rejected if siblings
+        share a name"""
+
+        root = ngamsContainer.ngamsContainer('root')
+        for name in ('child1', 'child2'):
+            root.addContainer(ngamsContainer.ngamsContainer(name))
+        self.db.createContainers([root] + root.getContainers())
+
+        cont = self.db.readHierarchy(root.getContainerId())
+        self.assertEqual('root', cont.getContainerName())
+        names = sorted(c.getContainerName() for c in cont.getContainers())
+        self.assertEqual(['child1', 'child2'], names)
+
+        root = ngamsContainer.ngamsContainer('root')
+        for name in ('child', 'child'):
+            root.addContainer(ngamsContainer.ngamsContainer(name))
+        self.assertRaises(Exception, self.db.createContainers, [root] + root.getContainers())
+
+    def test_set_container_sizes(self):
+        """Each container gets its own size, not a shared one"""
+
+        root = ngamsContainer.ngamsContainer('root')
+        child = ngamsContainer.ngamsContainer('child')
+        root.addContainer(child)
+        self.db.createContainers([root, child])
+
+        self.db.setContainerSizes([(root.getContainerId(), 10), (child.getContainerId(), 20)])
+        self.assertEqual(10, self.db.read(root.getContainerId()).getContainerSize())
+        self.assertEqual(20, self.db.read(child.getContainerId()).getContainerSize())
+
+    def test_add_files_to_containers_in_transaction(self):
+        """File entries and their container membership are rolled back together"""
+
+        root = ngamsContainer.ngamsContainer('root')
+        self.db.createContainers([root])
+        self.add_disk()
+
+        with self.assertRaises(ValueError):
+            with self.db.transaction() as t:
+                self.db.writeFileEntries('host-id', [file_info('file-1')], genSnapshot=0, transaction=t)
+                self.db.addFilesToContainers([(root.getContainerId(), 'file-1')], transaction=t)
+                raise ValueError()
+        self.assertEqual([], list(self.db.getFileInfoList('disk-id', fileId="*")))
+        cont = self.db.readHierarchy(root.getContainerId(), includeFiles=True)
+        self.assertEqual([], cont.getFilesInfo())
+
+    def test_failing_post_commit_action(self):
+        """A failing post-commit action doesn't hide the committed changes
+        or skip the actions after it"""
+
+        def fail():
+            raise ValueError()
+
+        self.add_disk()
+        actions = []
+        with self.db.transaction() as t:
+            self.db.updateDiskInfo(10, 'disk-id', transaction=t)
+            t.on_commit(fail)
+            t.on_commit(actions.append, True)
+        self.assertEqual([True], actions)
+        self.assertEqual(10, self.read_disk().getBytesStored())
+
+    def test_register_files_in_transaction(self):
+        """File entries, container membership, volume and container sizes
+        are all written or rolled back together"""
+
+        root = ngamsContainer.ngamsContainer('root')
+        self.db.createContainers([root])
+        self.add_disk()
+        file_infos = [file_info(file_id, 1, 10) for file_id in ('file-1', 'file-2')]
+
+        def register(fail):
+            with self.db.transaction() as t:
+                self.db.writeFileEntries('host-id', file_infos, genSnapshot=0, transaction=t)
+                self.db.addFilesToContainers([(root.getContainerId(), 'file-1'),
+                                              (root.getContainerId(), 'file-2')],
+                                             transaction=t)
+                self.db.updateDiskInfo(20, 'disk-id', 2, transaction=t)
+                self.db.setContainerSizes([(root.getContainerId(), 20)], transaction=t)
+                t.on_commit(committed.append, True)
+                if fail:
+                    raise ValueError()
+
+        # Nothing is left behind if the transaction fails
+        committed = []
+        with self.assertRaises(ValueError):
+            register(True)
+        self.assertFalse(committed)
+        self.assertEqual([], list(self.db.getFileInfoList('disk-id', fileId="*")))
+        self.assertEqual(0, self.read_disk().getNumberOfFiles())
+        self.assertEqual(0, self.db.read(root.getContainerId()).getContainerSize())
+
+        register(False)
+        self.assertEqual([True], committed)
+        cont = self.db.readHierarchy(root.getContainerId(), includeFiles=True)
+        self.assertEqual(['file-1', 'file-2'], sorted(fi.getFileId() for fi in cont.getFilesInfo()))
+        self.assertEqual(20, cont.getContainerSize())
+        disk_info = self.read_disk()
+        self.assertEqual(2, disk_info.getNumberOfFiles())
+        self.assertEqual(20, disk_info.getBytesStored())
@@ -20,6 +20,10 @@
 #    MA 02111-1307  USA
 #
 
+import email.parser
+import errno
+import os
+import tempfile
 import unittest
 
 from ngamsLib import ngamsCore, ngamsLib
@@ -44,4 +48,54 @@ class NgamsLibTests(unittest.TestCase):
         """Double-checks that filenames are properly escaped"""
 
         self.assertEqual('_', ngamsCore.to_valid_filename('?'))
-        self.assertEqual('__', ngamsCore.to_valid_filename('??'))
\ No newline at end of file
+        self.assertEqual('__', ngamsCore.to_valid_filename('??'))
+
+    def test_http_msg_obj_to_dic(self):
+        """HTTP headers are turned into a dictionary with lowercase keys"""
+
+        hdrs = 'Content-Length: 10\r\nContent-Disposition: attachment; filename="a:b"\r\n\r\n'
+        expected = {'content-length': '10', 'content-disposition': 'attachment; filename="a:b"'}
+        self.assertEqual(expected, ngamsLib.httpMsgObj2Dic(hdrs))
+        msg = email.parser.HeaderParser().parsestr(hdrs, headersonly=True)
+        self.assertEqual(expected, ngamsLib.httpMsgObj2Dic(msg))
+
+    def test_mv_file(self):
+        """Files are moved, creating the target directory if necessary"""
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            src = os.path.join(tmpdir, 'src')
+            tgt = os.path.join(tmpdir, 'a', 'b', 'tgt')
+            with open(src, 'wb') as f:
+                f.write(b'contents')
+            ngamsCore.mvFile(src, tgt)
+            self.assertFalse(os.path.exists(src))
+            with open(tgt, 'rb') as f:
+                self.assertEqual(b'contents', f.read())
+
+            # Moving a non-existing file fails
+            self.assertRaises(Exception, ngamsCore.mvFile, src, tgt)
+        finally:
+            ngamsCore.rmFile(tmpdir)
+
+    def test_mv_file_across_devices(self):
+        """Files are copied over when they cannot be renamed across devices"""
+
+        def rename(src, tgt):
+            raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+
+        tmpdir = tempfile.mkdtemp()
+        orig_rename = os.rename
+        os.rename = rename
+        try:
+            src = os.path.join(tmpdir, 'src')
+            tgt = os.path.join(tmpdir, 'a', 'tgt')
+            with open(src, 'wb') as f:
+                f.write(b'contents')
+            ngamsCore.mvFile(src, tgt)
+            self.assertFalse(os.path.exists(src))
+            with open(tgt, 'rb') as f:
+                self.assertEqual(b'contents', f.read())
+        finally:
+            os.rename = orig_rename
+            ngamsCore.rmFile(tmpdir)
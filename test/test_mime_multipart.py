@@ -170,6 +170,23 @@ class ngamsMIMEMultipartTest(ngamsTestLib.ngamsTestSuite):
             parser = ngamsMIMEMultipart.MIMEMultipartParser(handler, inputContent, len(message), size)
             parser.parse()
 
+    def test_FilesystemWriterSeveralSizes(self):
+        # Files must be written with exactly the same contents
+        # regardless of where the delimiters fall in the stream
+        message = self._createMIMEMessage(False)
+        for readSize, writeSize in [(2**i, 2**j) for i in range(12) for j in (0, 4, 10)]:
+            basePath = os.path.join(ngamsTestLib.tmp_root, 'output_%d_%d' % (readSize, writeSize))
+            handler = ngamsMIMEMultipart.FilesystemWriterHandler(writeSize, True, basePath)
+            parser = ngamsMIMEMultipart.MIMEMultipartParser(handler, io.BytesIO(message), len(message), readSize)
+            parser.parse()
+            for myfile in self.myfiles:
+                with open(myfile, 'rb') as f, open(os.path.join(basePath, myfile), 'rb') as f2:
+                    self.assertEqual(f.read(), f2.read())
+            self.assertEqual(len(self.myfiles), len(handler.getFileDataList()))
+            for _, filename, _, size, ctime in handler.getFileDataList():
+                self.assertEqual(os.path.getsize(filename), size)
+                self.assertEqual(os.path.getctime(filename), ctime)
+
     def test_FileInfoReader(self):
 
         size = random.randint(10, 100)